@@ -1,16 +1,34 @@
-import subprocess
 import os
 import json
-import requests
+import hashlib
+import sqlite3
+import time
 import re
 import sys
-import pandas as pd
-import networkx as nx
-import matplotlib.pyplot as plt
-from typing import Dict, List
+import threading
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
-@dataclass
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson parses several times faster than the stdlib; both accept bytes
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+_REQ_RE = re.compile(r'^([a-zA-Z0-9\-._]+)(?:([=<>!]+)([a-zA-Z0-9\-._*]+))?')
+_NPM_VER_RE = re.compile(r'^[^0-9]*')
+_NPM_EXACT_VER_RE = re.compile(r'^\d+\.\d+\.\d+(?:[-+][0-9A-Za-z.\-+]+)?$')
+
+# Retry policy for registry calls, shared by both HTTP clients
+_RETRIES = 3
+_RETRY_BACKOFF = 0.3
+_RETRY_STATUSES = (502, 503, 504)
+
+@dataclass(slots=True)
 class PackageInfo:
     name: str
     size: int
@@ -20,19 +38,54 @@ class PackageInfo:
     latest_version: str = ""
     vulnerabilities: str = ""
 
-@dataclass
+@dataclass(slots=True)
 class DockerSizeInfo:
     full: int
     slim: int
     alpine: int
 
+class MetadataCache:
+    """Persistent key/value store for registry metadata and audit results"""
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries "
+                "(key TEXT PRIMARY KEY, fetched_at REAL, etag TEXT, body TEXT)"
+            )
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return {'fetched_at', 'etag', 'body'} for key, or None if absent"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at, etag, body FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'fetched_at': row[0], 'etag': row[1], 'body': _json_loads(row[2])}
+
+    def set(self, key: str, body, etag: Optional[str] = None):
+        """Store body under key, stamped with the current time"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                (key, time.time(), etag, json.dumps(body))
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
 class LocalRequirementsAnalyzer:
     def __init__(self):
         self.pypi_cache = {}
         self.npm_cache = {}
         self.known_paid_services = {
-            'python': {'private-package', 'enterprise-pkg'},
-            'node': {'private-module', 'enterprise-pkg'}
+            'python': frozenset({'private-package', 'enterprise-pkg'}),
+            'node': frozenset({'private-module', 'enterprise-pkg'})
         }
         
         self.base_sizes = {
@@ -49,199 +102,405 @@ class LocalRequirementsAnalyzer:
         }
         self.local_pypi_repo = {}  
         self.local_npm_repo = {}  
+        self.max_workers = 16
+        self._cache_lock = threading.Lock()
+
+        # Registry metadata and audit reports persist across runs; entries
+        # younger than cache_ttl seconds are used without touching the network.
+        self.cache_ttl = 6 * 60 * 60
+        cache_home = os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache'))
+        cache_path = os.path.join(cache_home, 'fsize', 'metadata.sqlite3')
+        try:
+            self.disk_cache = MetadataCache(cache_path)
+        except (OSError, sqlite3.Error) as e:
+            # An unwritable cache directory only costs the cross-run reuse
+            print(f"Warning: cannot open cache at {cache_path}, caching in memory only: {e}")
+            self.disk_cache = MetadataCache(':memory:')
+
+        self.session = self._make_session()
+        # Shared for the analyzer's lifetime so every lookup, across all the
+        # files analyzed, fans out over the same workers and connections.
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def _make_session(self):
+        """Create the HTTP client shared by all registry calls"""
+        # Imported here so only the client actually used is loaded
+        try:
+            import httpx
+            # HTTP/2 multiplexes the worker threads' concurrent requests
+            # over a single TLS connection per registry host.
+            transport = httpx.HTTPTransport(
+                http2=True,
+                retries=_RETRIES,
+                limits=httpx.Limits(max_connections=self.max_workers,
+                                    max_keepalive_connections=self.max_workers)
+            )
+            return httpx.Client(transport=transport, follow_redirects=True)
+        except ImportError:
+            pass  # httpx, or its h2 extra, is not installed
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        # One pooled session so keep-alive connections are reused instead of
+        # paying a TCP+TLS handshake per request.
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=2 * self.max_workers,
+            max_retries=Retry(total=_RETRIES, backoff_factor=_RETRY_BACKOFF, status_forcelist=list(_RETRY_STATUSES))
+        )
+        session.mount('https://pypi.org', adapter)
+        session.mount('https://registry.npmjs.org', adapter)
+        return session
+
+    def close(self):
+        """Release pooled HTTP connections and worker threads"""
+        self.executor.shutdown(wait=False)
+        self.session.close()
+        self.disk_cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        executor = getattr(self, 'executor', None)
+        if executor is not None:
+            executor.shutdown(wait=False)
+        session = getattr(self, 'session', None)
+        if session is not None:
+            session.close()
 
     def analyze_requirements(self, file_path: str, file_type: str) -> List[PackageInfo]:
         """Analyze requirements file (requirements.txt or package.json)"""
+        specs = self._parse_requirements(file_path, file_type)
+        return self._build_package_infos(specs, file_type, self._submit_audit(specs, file_path, file_type))
+
+    def _parse_requirements(self, file_path: str, file_type: str) -> List[Tuple[str, str, bool]]:
+        """Parse a requirements file into (name, version, pinned) tuples"""
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
 
         if file_type == 'python':
-            return self._analyze_python_requirements(file_path)
+            return self._parse_python_requirements(file_path)
         elif file_type == 'node':
-            return self._analyze_node_requirements(file_path)
+            try:
+                return self._parse_node_requirements(file_path)
+            except json.JSONDecodeError:
+                print(f"Error: Invalid package.json file")
+                return []
         else:
             raise ValueError("Unsupported file type. Use 'python' or 'node'.")
 
-    def _analyze_python_requirements(self, requirements_path: str) -> List[PackageInfo]:
-        """Analyze Python requirements.txt file"""
-        results = []
+    def _parse_python_requirements(self, requirements_path: str) -> List[Tuple[str, str, bool]]:
+        """Parse requirements.txt into (name, version, pinned) tuples"""
         with open(requirements_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    match = re.match(r'^([a-zA-Z0-9\-._]+)(?:[=<>!]+([a-zA-Z0-9\-._]+))?', line)
-                    if match:
-                        package_name, version = match.groups()
-                        version = version or ""
-                        
-                        size = self._get_pypi_package_size(package_name)
-                        is_paid = self._is_paid_package(package_name, 'python')
-                        description = self._get_pypi_package_description(package_name)
-                        latest_version = self._get_latest_pypi_version(package_name)
-                        vulnerabilities = self._check_security_vulnerabilities(package_name, 'python')
-                        
-                        results.append(PackageInfo(
-                            name=package_name,
-                            size=size,
-                            is_paid=is_paid,
-                            version=version,
-                            description=description,
-                            latest_version=latest_version,
-                            vulnerabilities=vulnerabilities
-                        ))
-        return results
+            lines = f.read().splitlines()
+        specs = []
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            match = _REQ_RE.match(line)
+            if match:
+                package_name, operator, version = match.groups()
+                specs.append((package_name, version or "", self._is_exact_pin(line, match)))
+        return specs
+
+    def _is_exact_pin(self, line: str, match: re.Match) -> bool:
+        """Whether a requirement line pins one complete release, e.g. foo==1.2.3"""
+        _, operator, version = match.groups()
+        if operator != '==' or '*' in version or version.endswith('.'):
+            return False
+        # Anything after the version other than a marker or comment (e.g. ",<2")
+        # means the match did not cover the whole specifier.
+        rest = line[match.end():].lstrip()
+        return not rest or rest[0] in ';#'
 
-    def _analyze_node_requirements(self, package_json_path: str) -> List[PackageInfo]:
-        """Analyze Node.js package.json file"""
-        results = []
+    def _parse_node_requirements(self, package_json_path: str) -> List[Tuple[str, str, bool]]:
+        """Parse package.json dependencies into (name, version, pinned) tuples"""
         with open(package_json_path, 'r') as f:
-            try:
-                package_data = json.load(f)
-                all_deps = {**package_data.get('dependencies', {}), **package_data.get('devDependencies', {})}
-                
-                for package_name, version in all_deps.items():
-                    clean_version = re.sub(r'^[^0-9]*', '', version)
-                    size = self._get_npm_package_size(package_name)
-                    is_paid = self._is_paid_package(package_name, 'node')
-                    description = self._get_npm_package_description(package_name)
-                    latest_version = self._get_latest_npm_version(package_name)
-                    vulnerabilities = self._check_security_vulnerabilities(package_name, 'node')
-                    
-                    results.append(PackageInfo(
-                        name=package_name,
-                        size=size,
-                        is_paid=is_paid,
-                        version=clean_version,
-                        description=description,
-                        latest_version=latest_version,
-                        vulnerabilities=vulnerabilities
-                    ))
-            except json.JSONDecodeError:
-                print(f"Error: Invalid package.json file")
-                return []
+            package_data = json.load(f)
+        all_deps = {**package_data.get('dependencies', {}), **package_data.get('devDependencies', {})}
+        return [(package_name, _NPM_VER_RE.sub('', version), bool(_NPM_EXACT_VER_RE.match(version)))
+                for package_name, version in all_deps.items()]
+
+    def _submit_audit(self, specs: List[Tuple[str, str, bool]], file_path: str,
+                      package_type: str) -> Optional[Future]:
+        """Queue the security audit of a parsed file on the shared executor"""
+        if not specs:
+            return None
+        # The audit is a subprocess, not an HTTP call: queue it separately so
+        # it runs alongside the registry lookups instead of inside them.
+        return self.executor.submit(self._check_security_vulnerabilities, file_path, package_type)
+
+    def _build_package_infos(self, specs: List[Tuple[str, str, bool]], package_type: str,
+                             audit: Optional[Future]) -> List[PackageInfo]:
+        """Look up all packages concurrently, keeping the input order"""
+        if not specs:
+            return []
+        results = list(self.executor.map(lambda spec: self._build_package_info(*spec, package_type), specs))
+        vulnerabilities = audit.result()
+        for package in results:
+            if vulnerabilities is None:
+                package.vulnerabilities = "No security audit available"
+            else:
+                package.vulnerabilities = vulnerabilities.get(package.name.lower(), "")
         return results
 
-    def _get_pypi_package_size(self, package_name: str) -> int:
-        """Get package size from PyPI"""
-        if package_name in self.pypi_cache:
-            return self.pypi_cache[package_name]
-        try:
-            response = requests.get(f"https://pypi.org/pypi/{package_name}/json", timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                if 'info' in data and 'version' in data['info']:
-                    latest_version = data['info']['version']
-                    if latest_version in data['releases']:
-                        files = data['releases'][latest_version]
-                        wheel_files = [f for f in files if f['packagetype'] == 'bdist_wheel']
-                        if wheel_files:
-                            size = wheel_files[0]['size']
-                        else:
-                            sdist_files = [f for f in files if f['packagetype'] == 'sdist']
-                            size = sdist_files[0]['size'] if sdist_files else 0
-                        self.pypi_cache[package_name] = size
-                        return size
-        except Exception as e:
-            print(f"Error fetching PyPI package size for {package_name}: {e}")
-        return 0
+    def _build_package_info(self, package_name: str, version: str, pinned: bool,
+                            package_type: str) -> PackageInfo:
+        """Build a PackageInfo from registry metadata"""
+        # A pinned version is sized from that exact release, otherwise the latest
+        size_version = version if pinned else ""
+        if package_type == 'python':
+            size = self._get_pypi_package_size(package_name, size_version)
+            description = self._get_pypi_package_description(package_name)
+            latest_version = self._get_latest_pypi_version(package_name)
+        else:
+            size = self._get_npm_package_size(package_name, size_version)
+            description = self._get_npm_package_description(package_name)
+            latest_version = self._get_latest_npm_version(package_name)
+        return PackageInfo(
+            name=package_name,
+            size=size,
+            is_paid=self._is_paid_package(package_name, package_type),
+            version=version,
+            description=description,
+            latest_version=latest_version
+        )
+
+    def _fetch_pypi_metadata(self, package_name: str, version: str = "") -> Dict:
+        """Fetch and cache the PyPI JSON metadata for a package (latest release unless version is given)"""
+        cache_key = (package_name, version)
+        if cache_key in self.pypi_cache:
+            return self.pypi_cache[cache_key]
+        if version:
+            data = self._fetch_registry_json(f"https://pypi.org/pypi/{package_name}/{version}/json",
+                                             f"pypi:{package_name}=={version}", self._slim_pypi_metadata,
+                                             immutable=True)
+        else:
+            data = self._fetch_registry_json(f"https://pypi.org/pypi/{package_name}/json", f"pypi:{package_name}",
+                                             self._slim_pypi_metadata)
+        with self._cache_lock:
+            self.pypi_cache[cache_key] = data
+        return data
+
+    def _fetch_npm_metadata(self, package_name: str, version: str = "") -> Dict:
+        """Fetch and cache the npm registry metadata for a package (latest release unless version is given)"""
+        cache_key = (package_name, version)
+        if cache_key in self.npm_cache:
+            return self.npm_cache[cache_key]
+        # A single version manifest is far smaller than the full packument,
+        # which embeds every published version.
+        if version:
+            data = self._fetch_registry_json(f"https://registry.npmjs.org/{package_name}/{version}",
+                                             f"npm:{package_name}@{version}", self._slim_npm_manifest,
+                                             immutable=True)
+        else:
+            data = self._fetch_registry_json(f"https://registry.npmjs.org/{package_name}/latest",
+                                             f"npm:{package_name}", self._slim_npm_manifest)
+        with self._cache_lock:
+            self.npm_cache[cache_key] = data
+        return data
 
-    def _get_npm_package_size(self, package_name: str) -> int:
-        """Get package size from npm registry"""
-        if package_name in self.npm_cache:
-            return self.npm_cache[package_name]
+    def _fetch_registry_json(self, url: str, cache_key: str, slim: Callable[[Dict], Dict],
+                             immutable: bool = False) -> Dict:
+        """GET a registry document, served from the disk cache while fresh
+
+        Immutable documents (a specific published release) never go stale.
+        """
+        entry = self.disk_cache.get(cache_key)
+        headers = {}
+        if entry is not None:
+            if immutable or time.time() - entry['fetched_at'] < self.cache_ttl:
+                return entry['body']
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
         try:
-            response = requests.get(f"https://registry.npmjs.org/{package_name}", timeout=5)
+            response = self.session.get(url, headers=headers, timeout=5)
+            # The requests adapter already retries these statuses itself; httpx's
+            # transport only retries failed connects, so retry them here too.
+            for attempt in range(_RETRIES):
+                if response.status_code not in _RETRY_STATUSES:
+                    break
+                time.sleep(_RETRY_BACKOFF * 2 ** attempt)
+                response = self.session.get(url, headers=headers, timeout=5)
+            if response.status_code == 304 and entry is not None:
+                self.disk_cache.set(cache_key, entry['body'], entry['etag'])
+                return entry['body']
             if response.status_code == 200:
-                data = response.json()
-                latest_version = data['dist-tags'].get('latest', '')
-                if latest_version and latest_version in data['versions']:
-                    version_data = data['versions'][latest_version]
-                    size = version_data['dist'].get('unpackedSize', version_data['dist'].get('size', 0))
-                    self.npm_cache[package_name] = size
-                    return size
+                data = slim(_json_loads(response.content))
+                self.disk_cache.set(cache_key, data, response.headers.get('ETag'))
+                return data
         except Exception as e:
-            print(f"Error fetching npm package size for {package_name}: {e}")
-        return 0
+            print(f"Error fetching {url}: {e}")
+        # Serve stale metadata rather than nothing if the registry is unreachable
+        return entry['body'] if entry is not None else {}
+
+    def _slim_pypi_metadata(self, data: Dict) -> Dict:
+        """Keep only the PyPI fields the analyzer reads, dropping the release history"""
+        info = data.get('info', {})
+        version = info.get('version', '')
+        # 'urls' lists the requested release's files without walking 'releases'
+        files = data.get('urls') or data.get('releases', {}).get(version, [])
+        return {
+            'info': {'version': version, 'description': info.get('description', 'No description available')},
+            'releases': {version: [{'packagetype': f['packagetype'], 'size': f['size']} for f in files]},
+        }
+
+    def _slim_npm_manifest(self, data: Dict) -> Dict:
+        """Reshape an npm version manifest into the packument fields the analyzer reads"""
+        version = data.get('version', '')
+        dist = data.get('dist', {})
+        return {
+            'description': data.get('description', 'No description available'),
+            'dist-tags': {'latest': version},
+            'versions': {version: {'dist': {k: dist[k] for k in ('unpackedSize', 'size') if k in dist}}},
+        }
+
+    def _get_pypi_package_size(self, package_name: str, version: str = "") -> int:
+        """Get package size from PyPI (latest release unless version is given)"""
+        data = self._fetch_pypi_metadata(package_name, version)
+        if version and not data:
+            # A pin the registry doesn't know falls back to the latest release
+            data = self._fetch_pypi_metadata(package_name)
+        release = data.get('info', {}).get('version')
+        files = data.get('releases', {}).get(release)
+        if not files:
+            return 0
+        first = (next((f for f in files if f['packagetype'] == 'bdist_wheel'), None)
+                 or next((f for f in files if f['packagetype'] == 'sdist'), None))
+        return first['size'] if first else 0
+
+    def _get_npm_package_size(self, package_name: str, version: str = "") -> int:
+        """Get package size from npm registry (latest release unless version is given)"""
+        data = self._fetch_npm_metadata(package_name, version)
+        if version and not data:
+            # A pin the registry doesn't know falls back to the latest release
+            data, version = self._fetch_npm_metadata(package_name), ""
+        release = version or data.get('dist-tags', {}).get('latest', '')
+        version_data = data.get('versions', {}).get(release)
+        if not version_data:
+            return 0
+        dist = version_data.get('dist', {})
+        return dist.get('unpackedSize', dist.get('size', 0))
 
     def _is_paid_package(self, package_name: str, package_type: str) -> bool:
         """Check if package is a known paid package"""
-        return package_name in self.known_paid_services[package_type]
+        return package_name in self.known_paid_services.get(package_type, frozenset())
 
     def _get_pypi_package_description(self, package_name: str) -> str:
         """Get package description from PyPI"""
-        try:
-            response = requests.get(f"https://pypi.org/pypi/{package_name}/json", timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                return data['info'].get('description', 'No description available')
-        except Exception as e:
-            print(f"Error fetching PyPI package description for {package_name}: {e}")
-        return "No description available"
+        data = self._fetch_pypi_metadata(package_name)
+        return data.get('info', {}).get('description', 'No description available')
 
     def _get_npm_package_description(self, package_name: str) -> str:
         """Get package description from NPM registry"""
-        try:
-            response = requests.get(f"https://registry.npmjs.org/{package_name}", timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                return data.get('description', 'No description available')
-        except Exception as e:
-            print(f"Error fetching NPM package description for {package_name}: {e}")
-        return "No description available"
+        data = self._fetch_npm_metadata(package_name)
+        return data.get('description', 'No description available')
 
-    def _check_security_vulnerabilities(self, package_name: str, package_type: str) -> str:
-        """Check for security vulnerabilities"""
+    def _check_security_vulnerabilities(self, file_path: str, package_type: str) -> Optional[Dict[str, str]]:
+        """Audit a whole requirements file, returning {package: vulnerability summary} (None if no audit ran)"""
         if package_type == 'python':
-            return subprocess.run(['safety', 'check', '--bare', '--dependency', package_name], capture_output=True).stdout.decode().strip()
+            audit, inputs = self._bulk_python_audit, [file_path]
         elif package_type == 'node':
-            return subprocess.run(['npm', 'audit', 'package', package_name], capture_output=True).stdout.decode().strip()
+            lock_path = os.path.join(os.path.dirname(os.path.abspath(file_path)), 'package-lock.json')
+            audit, inputs = self._bulk_node_audit, [file_path, lock_path]
         else:
-            return "No security audit available"
+            return None
+        digest = hashlib.sha256()
+        for path in inputs:
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+        cache_key = f"audit:{package_type}:{digest.hexdigest()}"
+        entry = self.disk_cache.get(cache_key)
+        if entry is not None and time.time() - entry['fetched_at'] < self.cache_ttl:
+            return entry['body']
+        summaries = audit(file_path)
+        if summaries is None:
+            return None
+        self.disk_cache.set(cache_key, summaries)
+        return summaries
 
-    def _get_latest_pypi_version(self, package_name: str) -> str:
-        """Get the latest version for a Python package"""
+    def _bulk_python_audit(self, requirements_path: str) -> Optional[Dict[str, str]]:
+        """Run a single `safety check` over requirements.txt (None if it fails)"""
+        import subprocess
         try:
-            response = requests.get(f"https://pypi.org/pypi/{package_name}/json")
-            if response.status_code == 200:
-                data = response.json()
-                return data['info']['version']
+            output = subprocess.run(['safety', 'check', '-r', requirements_path, '--json'],
+                                    capture_output=True).stdout.decode()
+            report = json.loads(output)
+            # safety 2.x+ reports a dict of vulnerabilities, 1.x a list of rows
+            if isinstance(report, dict):
+                findings = [(v['package_name'], f"{v['vulnerability_id']}: {v['advisory']}")
+                            for v in report.get('vulnerabilities', [])]
+            else:
+                findings = [(row[0], f"{row[4]}: {row[3]}") for row in report]
         except Exception as e:
-            print(f"Error fetching PyPI package version for {package_name}: {e}")
-        return ""
+            print(f"Error running safety for {requirements_path}: {e}")
+            return None
+        summaries = {}
+        for package_name, summary in findings:
+            summaries.setdefault(package_name.lower(), []).append(summary)
+        return {name: "; ".join(items) for name, items in summaries.items()}
 
-    def _get_latest_npm_version(self, package_name: str) -> str:
-        """Get the latest version for an npm package"""
+    def _bulk_node_audit(self, package_json_path: str) -> Optional[Dict[str, str]]:
+        """Run a single `npm audit` in the package.json directory (None if it fails)"""
+        import subprocess
         try:
-            response = requests.get(f"https://registry.npmjs.org/{package_name}")
-            if response.status_code == 200:
-                data = response.json()
-                return data["dist-tags"]["latest"]
+            output = subprocess.run(['npm', 'audit', '--json'], capture_output=True,
+                                    cwd=os.path.dirname(os.path.abspath(package_json_path))).stdout.decode()
+            report = json.loads(output)
+            # npm still prints JSON when the audit itself fails (e.g. ENOLOCK)
+            if report.get('error'):
+                error = report['error']
+                print(f"Error running npm audit for {package_json_path}: "
+                      f"{error.get('summary', error) if isinstance(error, dict) else error}")
+                return None
+            summaries = {}
+            # npm 7+ reports per-package "vulnerabilities", npm 6 per-id "advisories"
+            for package_name, vulnerability in report.get('vulnerabilities', {}).items():
+                titles = [via['title'] for via in vulnerability.get('via', []) if isinstance(via, dict)]
+                summaries.setdefault(package_name.lower(), []).append(
+                    f"{vulnerability.get('severity', 'unknown')}: {', '.join(titles) or 'via dependencies'}")
+            for advisory in report.get('advisories', {}).values():
+                summaries.setdefault(advisory['module_name'].lower(), []).append(
+                    f"{advisory.get('severity', 'unknown')}: {advisory.get('title', '')}")
         except Exception as e:
-            print(f"Error fetching npm package version for {package_name}: {e}")
-        return ""
+            print(f"Error running npm audit for {package_json_path}: {e}")
+            return None
+        return {name: "; ".join(items) for name, items in summaries.items()}
+
+    def _get_latest_pypi_version(self, package_name: str) -> str:
+        """Get the latest version for a Python package"""
+        return self._fetch_pypi_metadata(package_name).get('info', {}).get('version', '')
+
+    def _get_latest_npm_version(self, package_name: str) -> str:
+        """Get the latest version for an npm package"""
+        return self._fetch_npm_metadata(package_name).get('dist-tags', {}).get('latest', '')
 
     def estimate_docker_sizes(self, packages: List[PackageInfo], package_type: str) -> DockerSizeInfo:
         """Estimate Docker image sizes for all variants"""
-        packages_size = sum(pkg.size for pkg in packages)
-        overhead = int(packages_size * 0.15)
+        packages_size = sum([pkg.size for pkg in packages])
+        # 15% install overhead, in integer math so no float round-trip is needed
+        total = packages_size + packages_size * 15 // 100
         base_sizes = self.base_sizes[package_type]
         return DockerSizeInfo(
-            full=base_sizes['full'] + packages_size + overhead,
-            slim=base_sizes['slim'] + packages_size + overhead,
-            alpine=base_sizes['alpine'] + packages_size + overhead
+            full=base_sizes['full'] + total,
+            slim=base_sizes['slim'] + total,
+            alpine=base_sizes['alpine'] + total
         )
 
 
     def _check_for_conflicts(self, package_list: List[PackageInfo]):
-        """Detect version conflicts between dependencies"""
-        version_map = {}
-        conflicts = []
+        """Detect version conflicts between dependencies, as (name, sorted versions) pairs"""
+        versions = defaultdict(set)
         for package in package_list:
-            if package.name not in version_map:
-                version_map[package.name] = package.version
-            elif version_map[package.name] != package.version:
-                conflicts.append((package.name, version_map[package.name], package.version))
-        return conflicts
+            versions[package.name].add(package.version)
+        return [(name, sorted(found)) for name, found in versions.items() if len(found) > 1]
 
     def _get_local_package_info(self, package_name: str, package_type: str) -> Dict:
         """Retrieve package data from local package repository (mock-up example)"""
@@ -253,25 +512,33 @@ class LocalRequirementsAnalyzer:
 
     def analyze_multiple_projects(self, file_paths: List[str], file_type: str) -> List[PackageInfo]:
         """Analyze multiple requirements files (Python/Node.js)"""
+        parsed = [(path, self._parse_requirements(path, file_type)) for path in file_paths]
+        # Queue every file's audit before the registry fan-out so they overlap it
+        audits = [self._submit_audit(specs, path, file_type) for path, specs in parsed]
+        # Fetch each distinct package once up front; the per-file passes below
+        # then read from the metadata cache instead of re-querying the registry.
+        # Pinned specs also need their exact release; unpinned ones only the latest.
+        lookups = dict.fromkeys((name, version if pinned else "")
+                                for _, specs in parsed for name, version, pinned in specs)
+        lookups.update(dict.fromkeys((name, "") for name, _ in list(lookups)))
+        fetch = self._fetch_pypi_metadata if file_type == 'python' else self._fetch_npm_metadata
+        list(self.executor.map(lambda lookup: fetch(*lookup), lookups))
         all_packages = []
-        for path in file_paths:
-            packages = self.analyze_requirements(path, file_type)
-            all_packages.extend(packages)
+        for (_, specs), audit in zip(parsed, audits):
+            all_packages.extend(self._build_package_infos(specs, file_type, audit))
         return all_packages
 
     def _get_release_notes(self, package_name: str, package_type: str) -> str:
         """Fetch release notes for a package"""
         if package_type == 'python':
-            response = requests.get(f"https://pypi.org/pypi/{package_name}/json")
-            return response.json().get("releases", {}).get("latest", {}).get("changelog", "No release notes available.")
+            return self._fetch_pypi_metadata(package_name).get("releases", {}).get("latest", {}).get("changelog", "No release notes available.")
         elif package_type == 'node':
-            response = requests.get(f"https://registry.npmjs.org/{package_name}")
-            return response.json().get("versions", {}).get("latest", {}).get("changelog", "No release notes available.")
+            return self._fetch_npm_metadata(package_name).get("versions", {}).get("latest", {}).get("changelog", "No release notes available.")
         return ""
 
     def _get_package_cost_estimation(self, package_name: str, package_type: str) -> str:
         """Fetch cost estimation for enterprise packages (mock-up)"""
-        if package_name in self.known_paid_services.get(package_type, []):
+        if self._is_paid_package(package_name, package_type):
             return f"The enterprise package for {package_name} costs $XYZ/month"
         return "This package is free."
 
@@ -281,6 +548,7 @@ class LocalRequirementsAnalyzer:
 
     def get_container_stats(self, container_id: str) -> Dict:
         """Fetch resource consumption metrics for a running container"""
+        import subprocess
         return subprocess.run(['docker', 'stats', '--no-stream', container_id], capture_output=True).stdout.decode()
 
     def _suggest_optimized_packages(self, package_name: str) -> str:
@@ -290,8 +558,8 @@ class LocalRequirementsAnalyzer:
         return "No optimization available."
 def main(file_paths: List[str], file_type: str):
     try:
-        analyzer = LocalRequirementsAnalyzer()
-        packages = analyzer.analyze_multiple_projects(file_paths, file_type)
+        with LocalRequirementsAnalyzer() as analyzer:
+            packages = analyzer.analyze_multiple_projects(file_paths, file_type)
         
         output_file = "analysis_output.json"
         detailed_output = [{
@@ -304,20 +572,20 @@ def main(file_paths: List[str], file_type: str):
             "vulnerabilities": package.vulnerabilities,
         } for package in packages]
         
-        with open(output_file, 'w') as f:
-            json.dump(detailed_output, f, indent=4)
+        if orjson is not None:
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(detailed_output, option=orjson.OPT_INDENT_2))
+        else:
+            # Same bytes as orjson: UTF-8 text, 2-space indent
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(detailed_output, f, indent=2, ensure_ascii=False)
         print(f"Analysis details saved to: {output_file}")
         
         # Display concise output to console
-        concise_data = [{
-            "Name": package.name,
-            "Size (bytes)": package.size,
-            "Is Paid": "Yes" if package.is_paid else "No"
-        } for package in packages]
-        
-        df = pd.DataFrame(concise_data)
         print("\nDependency Overview:")
-        print(df.to_string(index=False))
+        print(f"{'Name':<30} {'Size (bytes)':>14} {'Is Paid':>7}")
+        for package in packages:
+            print(f"{package.name:<30} {package.size:>14} {'Yes' if package.is_paid else 'No':>7}")
         
         docker_sizes = analyzer.estimate_docker_sizes(packages, file_type)
         print(f"\nDocker Sizes Estimate (full/slim/alpine): "
@@ -326,8 +594,8 @@ def main(file_paths: List[str], file_type: str):
         conflicts = analyzer._check_for_conflicts(packages)
         if conflicts:
             print("\nConflicts Detected:")
-            for conflict in conflicts:
-                print(f"{conflict[0]}: Version conflict between {conflict[1]} and {conflict[2]}")
+            for name, versions in conflicts:
+                print(f"{name}: Version conflict between {', '.join(v or 'unspecified' for v in versions)}")
         else:
             print("\nNo version conflicts detected.")
     